@@ -18,6 +18,19 @@
 # 4- Using *args and **kwargs
 # 5- Built-in Python decorators (@staticmethod, @classmethod (in-depth), @abstractmethod, @property (in-depth), etc.)
 
+import datetime
+import importlib.util
+import inspect
+import logging
+import os
+from dataclasses import dataclass
+from functools import lru_cache, update_wrapper, wraps
+from math import pi as _PI
+from operator import add as _add
+
+__all__ = ["log", "maybe_njit", "add", "MyClass", "Person", "area_of", "Circle"]
+
+logger = logging.getLogger(__name__)
 
 # - - - - - - -
 #             -
@@ -38,7 +51,23 @@
 
 # The "log" function is a decorator. It takes in any other function as input and wraps it with the "wrapper" function.
 # The decorator then returns the definition of the new wrapped function "wrapper", which we can call whenever we want.
-def log(func):
+def log(func=None, *, pure=False):
+
+    # Explanation of the "pure" parameter:
+    # A pure function always returns the same result for the same arguments and has no other effects (like "add").
+    # For such functions, we can remember (cache) the result for each set of arguments with functools.lru_cache, so calling
+    # the decorated function again with the same arguments returns the stored result without calling "func" at all.
+    # Note that on such a cached call "wrapper" does not run either, so nothing is logged for it.
+    # The cache keeps at most 128 results; when it is full, the least recently used one is dropped, so memory
+    # does not keep growing when the function is called with many different arguments.
+    # All arguments must be hashable (e.g., numbers, strings, tuples, but not lists or dictionaries).
+    # Because "log" can now take an extra argument, it can be used in two ways:
+    # @log -> Python calls log(add), as before.
+    # @log(pure=True) -> Python first calls log(pure=True), which returns "decorator", and then calls decorator(add).
+    if func is None:
+        def decorator(func):
+            return log(func, pure=pure)
+        return decorator
 
     # Notice that here we define the "wrapper" function is defined inside of the decorator.
     # This means that it is not visible and cannot be called directly with its name from outside this decorator.
@@ -60,12 +89,64 @@ def log(func):
     # **kwargs will collect all keyword arguments into a dictionary. For example, for add(num1=1, num2=2),
     # **kwargs will be = {'num1' : 1, 'num2': 2}
 
+    # Turning the messages off entirely:
+    # The messages are only logged if the environment variable DECORATOR_LOG is set to "1" when "log" is called
+    # (e.g., DECORATOR_LOG=1 python decorators.py). We read it once, here, and the wrappers see it through the Closure.
+    # When it is off, the wrappers just call "func" and return its result, with almost no extra cost.
+    verbose = os.environ.get("DECORATOR_LOG") == "1"
+
+    # We also look up the logger methods once, here, instead of reading logger.debug (a global variable and then
+    # an attribute) on every call. Like "func" and "verbose", the wrappers see them through the Closure (explained
+    # inside "wrapper" below), which is almost as fast as reading a local variable.
+    # Note that we do not pass them as default arguments (e.g., def wrapper(*args, _func=func, **kwargs)): those would
+    # be real parameters of "wrapper", so a caller could pass (or accidentally override) them by keyword.
+    debug = logger.debug
+    enabled = logger.isEnabledFor
+
+    # Choosing a faster "wrapper" at decoration time:
+    # If "func" can only ever receive positional arguments (e.g., built-ins like operator.add, whose signature is
+    # (a, b, /)), there is no point in collecting **kwargs, because any keyword argument would be an error anyway.
+    # In that case we return a simpler "wrapper_pos" that skips creating the (always empty) kwargs dictionary on
+    # every call. This check is done only once, here, not every time the wrapped function is called.
+    # Note that parameters like num1 and num2 in add(num1, num2) can still be passed as keywords (add(num1=1, num2=2)),
+    # so functions like "add" keep using the general "wrapper" below.
+    if _accepts_only_positional(func):
+        @wraps(func)
+        def wrapper_pos(*args):
+            if not verbose:
+                return func(*args)
+            if enabled(logging.DEBUG):
+                debug("Calling the wrapped function with arguments %r, %r", args, {})
+            result = func(*args)
+            debug("Wrapped function execution complete!")
+            return result
+
+        return _memoize(wrapper_pos, func) if pure else wrapper_pos
+
+    # Why logging instead of print:
+    # print(f"...") always builds the full message, including the repr() of every argument, even if nobody reads it.
+    # logger.debug("... %r", args) only formats the message if DEBUG logging is enabled, so when logging is turned off,
+    # "wrapper" does almost no extra work. We also check enabled(logging.DEBUG) before the first message, so that
+    # we do not even pass args and kwargs along when they would not be printed.
+    # To see the messages, set DECORATOR_LOG=1 and enable DEBUG logging, e.g., logging.basicConfig(level=logging.DEBUG).
+
+    # Explanation of @wraps(func):
+    # Without it, the returned "wrapper" would hide the identity of "func" (e.g., log(add).__name__ would be 'wrapper').
+    # @wraps(func) copies the name, docstring, etc. of "func" onto "wrapper" and stores the original function in
+    # wrapper.__wrapped__, so tools like profilers and debuggers still see "add". The copying happens once here,
+    # when "wrapper" is defined, so it adds nothing to the cost of calling "wrapper".
+    @wraps(func)
     def wrapper(*args, **kwargs):
         # Here we will implement the definition of the "wrapper" function, which will extend or modify the definition of the
         # original function "func".
-        print(f"Calling the wrapped function with arguments {args}, {kwargs}")
-        # for the line above, if we call a decorated add(1, 2) -> prints: Calling the wrapped function with arguments (1, 2), {}
-        # but if we call add(num1=1, num2=2) -> prints: Calling the wrapped function with arguments (), {'num1': 1, 'num2': 2}
+        if not verbose:
+            if kwargs:
+                return func(*args, **kwargs)
+            return func(*args)
+        if enabled(logging.DEBUG):
+            debug("Calling the wrapped function with arguments %r, %r", args, kwargs)
+        # for the line above, if we call a decorated add(1, 2) -> logs: Calling the wrapped function with arguments (1, 2), {}
+        # but if we call add(num1=1, num2=2) -> logs: Calling the wrapped function with arguments (), {'num1': 1, 'num2': 2}
 
         # Here we call the original function to execute its normal functionality
         # An important thing to note here is that "wrapper" can see "func" here, even though it does not take it as a parameter.
@@ -75,19 +156,114 @@ def log(func):
         # Meaning that the reference is kept alive even after the outer function has finished execution.
         # This concept is known as Closures (because the inner function closes over the outer variables (e.g., func))
         # If we would have defined a new local variable inside "log", "wrapper" would still be able to see that variable because of the Closure.
-        func(*args, **kwargs)
-        print(f"Wrapped function execution complete!")
+        # We keep the value returned by "func" so that the caller of "wrapper" receives it, just like it would from "func".
+        # Most calls pass no keyword arguments, so in that case we call func(*args) and skip passing along
+        # the empty kwargs dictionary, which Python would otherwise have to unpack and copy on every call.
+        if kwargs:
+            result = func(*args, **kwargs)
+        else:
+            result = func(*args)
+        debug("Wrapped function execution complete!")
+        return result
 
     # The only thing we do inside the decorator is return the "wrapper" function which will contain all of the desired functionality.
     # We do not use parenthesis here because we want to return the definition of the "wrapper" function, not call it.
+    # If "func" is pure, we return "wrapper" wrapped once more by lru_cache (see the "pure" parameter above).
+    if pure:
+        return _memoize(wrapper, func)
     return wrapper 
 
 
+# Helper used by "log" to cache the results of a wrapper of a pure function "func".
+# typed=True keeps arguments of different types apart: without it, add(1, 2) and add(1.0, 2.0) would share one
+# cached result (because 1 == 1.0), and the second call would return the int 3 instead of the float 3.0.
+# lru_cache sets __wrapped__ to the wrapper it receives, so we point it back at "func" (as @wraps does in "log").
+def _memoize(wrapper, func):
+    cached = lru_cache(maxsize=128, typed=True)(wrapper)
+    cached.__wrapped__ = func
+    return cached
+
+
+# Helper used by "log" to decide (once, at decoration time) whether "func" can only be called with positional arguments.
+def _accepts_only_positional(func) -> bool:
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        # Some callables do not expose a signature. We cannot be sure about them, so we use the general "wrapper".
+        return False
+    return all(
+        parameter.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.VAR_POSITIONAL)
+        for parameter in parameters
+    )
+
+
+# "maybe_njit" is a decorator that compiles a function to machine code with Numba, but only when it is first called.
+# Importing Numba and compiling take a noticeable amount of time, so a script that never calls the function (or calls it
+# only once) should not pay for it on import.
+# If Numba is not installed, maybe_njit returns the original Python function unchanged, so calling it costs nothing
+# extra. importlib.util.find_spec("numba") only checks whether Numba can be found; it does not import it.
+# Otherwise, unlike "log", this decorator returns an object of the class "_LazyJit" instead of an inner function. Any object that
+# defines __call__ can be called like a function, which lets it remember the compiled function in self._compiled.
+# The arguments given to maybe_njit(...) are passed to numba.njit(...) unchanged.
+# Like "log", it can be used in two ways:
+# @maybe_njit -> Python calls maybe_njit(add), so the only argument is the function itself.
+# @maybe_njit(cache=True) -> Python first calls maybe_njit(cache=True), which returns "decorator", and then calls decorator(add).
+# A signature given as a string (e.g., maybe_njit("f8(f8)")) is not callable, so it is not mistaken for the function.
+def maybe_njit(*jit_args, **jit_kwargs):
+    if len(jit_args) == 1 and not jit_kwargs and callable(jit_args[0]):
+        return maybe_njit()(jit_args[0])
+
+    def decorator(fn):
+        if importlib.util.find_spec("numba") is None:
+            return fn
+        return _LazyJit(fn, jit_args, jit_kwargs)
+    return decorator
+
+
+class _LazyJit:
+
+    def __init__(self, fn, jit_args, jit_kwargs):
+        # Same as @wraps(fn) in "log": copies the name, docstring, etc. of "fn" and sets self.__wrapped__ = fn.
+        update_wrapper(self, fn)
+        self._jit_args = jit_args
+        self._jit_kwargs = jit_kwargs
+        self._compiled = None
+
+    def __call__(self, *args, **kwargs):
+        compiled = self._compiled
+        if compiled is None:
+            # First call only: compile (or fall back to Python) and keep the result for all later calls.
+            compiled = self._compiled = self._compile()
+        return compiled(*args, **kwargs)
+
+    # pickle (used, e.g., by multiprocessing to send functions to other processes) saves functions by their name and
+    # looks them up again when loading. Returning the name here makes pickle save this object the same way, so that
+    # loading it finds the decorated function in this module instead of failing.
+    def __reduce__(self):
+        return self.__qualname__
+
+    def _compile(self):
+        try:
+            import numba
+        except ImportError:
+            return self.__wrapped__
+        return numba.njit(*self._jit_args, **self._jit_kwargs)(self.__wrapped__)
+
+
 # This is the function we want to extend with our decorator.
+# @maybe_njit compiles "add" to machine code with Numba, so calling it skips the Python interpreter entirely.
+# We do not give Numba an exact signature (like "i8(i8,i8)"), so it compiles a version for whatever argument types
+# "add" is called with (e.g., ints or floats). With a fixed signature, add(1.5, 2.5) would be turned into an int
+# addition with Numba, but not without it, so "add" would behave differently depending on whether Numba is installed.
+# Numba only supports numbers that fit in 64 bits, though. When Numba is installed, "add" raises an error for larger
+# ints (e.g., add(2**70, 1)), while plain Python handles them.
+# cache=True saves the compiled code on disk so that later runs do not have to compile it again.
+# Note that "add" no longer prints the sum itself; printing from compiled code is slow, so the caller prints the result.
+@maybe_njit(cache=True)
 def add(num1: int, num2: int) -> int:
-    sum = num1 + num2
-    print(f"Sum = {sum}")
-    return sum
+    # We avoid naming this variable "sum", which would hide Python's built-in sum() function inside "add".
+    total = num1 + num2
+    return total
 
 
 # - - - - - - - - - - - - - - - -
@@ -125,13 +301,19 @@ def add(num1: int, num2: int) -> int:
 # but it will not be called again when we run log_add(1, 2) or whenever we run log_add() because log_add() will simply call the
 # wrapper function which was defined with the reference to the "add" function when we called log_add = log(add) for the first time.
 log_add = log(add)
-log_add(1, 2)
+# The call log_add(1, 2) is in the "Running the examples" section at the end of this file.
 
 # A way to do the above in a single line would be
 # log(add)(1, 2)
 # The first part 'log(add)' will call the decorator and return the definition of the new wrapped function.
 # The second part '(1, 2)' will call the returned (newly defined/wrapped) function with the arguments (1, 2).
-# This is exactly equivalent to the first two-line example.
+# This is exactly equivalent to writing log_add = log(add) and then calling log_add(1, 2).
+
+# Any function can be decorated, including built-in ones. Below we decorate operator.add (imported as _add), which does
+# exactly what our "add" does but is written in C, so calling it is cheaper than calling a Python function.
+# Thanks to @wraps in "log", log_builtin_add.__name__ is still 'add'. Since operator.add only accepts positional arguments,
+# "log" returns its faster "wrapper_pos" here, and log_builtin_add(num1=1, num2=2) would raise a TypeError.
+log_builtin_add = log(_add)
 
 
 # - - - - - - - - - - - - - -
@@ -167,10 +349,10 @@ def example2(mandatory_param, *args):
 
 # Here, if we simply call example2(), we would get -> TypeError: example2() missing 1 required positional argument: 'mandatory_param'.
 # but we can call example 1 normally as below:
-example1() # Outputs -> "Executing Example 1".
+# example1() # Outputs -> "Executing Example 1".
 # This is because *args and **kwargs only catch EXTRA arguments. They do not mandate any arguments to be passed.
 # Take the following example:
-example2(1, 5, 7, "Hello") # Outputs -> "Executing Example 2"
+# example2(1, 5, 7, "Hello") # Outputs -> "Executing Example 2"
 # The line above runs normally. What happens is that the first positional argument (i.e., 1) gets assigned to the parameter "mandatory_param",
 # while all other extra arguments (i.e., 5 , 7 , "Hello") are caught as a tuple inside args.
 # In this case args = (5, 7, 'Hello')
@@ -186,43 +368,55 @@ example2(1, 5, 7, "Hello") # Outputs -> "Executing Example 2"
 # Python comes with several built in decorators:
 # 1- @staticmethod -> Used inside a class to define a method that doesn’t take self or cls. The method
 # can be called directly from the class without creating an instance.
-
-# 2- @classmethod -> Used for a method that receives the class itself as the first argument (cls) instead of an instance.
-# Useful for factory methods or methods that affect the class rather than an instance.
 # Example:
 
 class MyClass:
 
     count = 0 # A class attribute -> shared by all instances
 
-    @classmethod
-    def increment_count(cls):
-        cls.count += 1
+    # This could also be written as a @classmethod that does cls.count += 1. However, every call to a classmethod
+    # first creates a new bound method that carries "cls", while a staticmethod is just the plain function.
+    # Since we always want to update MyClass.count itself, we do not need "cls" and can use the cheaper staticmethod.
+    # (With cls.count += 1, calling the method on a subclass would instead create a separate count on that subclass.)
+    @staticmethod
+    def increment_count():
+        MyClass.count += 1
 
-print(f"Count before incrementing = {MyClass.count}")
-MyClass.increment_count()
-print(f"Count after incrementing = {MyClass.count}")
+# MyClass.increment_count() -> increments MyClass.count from 0 to 1.
+
+# 2- @classmethod -> Used for a method that receives the class itself as the first argument (cls) instead of an instance.
+# Useful for factory methods or methods that affect the class rather than an instance.
 
 # Factory method -> A design pattern where a method returns an instance of the class,
 # often with some custom initialization or logic. Factory methods are often marked with @classmethod.
 # Example:
 
+# @dataclass is another decorator that works on a class. It reads the annotated class attributes (name: str, age: int)
+# and generates an __init__(self, name, age) that assigns them, so we do not have to write it ourselves.
+# With slots=True it also generates __slots__ = ("name", "age") (see __slots__ in the "Circle" class below).
+# eq=False keeps the usual behavior of objects: two persons are only equal if they are the same object, and they can
+# be used in sets and as dictionary keys. With the default eq=True, @dataclass would compare the fields instead and
+# set __hash__ to None, which makes instances unhashable.
+# weakref_slot=True adds "__weakref__" to the slots, so weak references keep working (see "Circle" below).
+# Note: slots=True needs Python 3.10 or newer, and weakref_slot=True needs Python 3.11 or newer.
+@dataclass(slots=True, eq=False, weakref_slot=True)
 class Person:
 
-    def __init__(self, name, age):
-        self.name = name
-        self.age = age
+    name: str
+    age: int
+
+    # A class attribute computed once, when the class is defined, instead of on every call to from_birth_year.
+    # It has no annotation, so @dataclass does not treat it as a field of __init__.
+    _CURRENT_YEAR = datetime.date.today().year
 
     # This is a factory method
     @classmethod
     def from_birth_year(cls, name, birth_year):
-        current_year = 2025
-        age = current_year - birth_year
+        age = cls._CURRENT_YEAR - birth_year
         return cls(name, age)  # creates and returns an instance
     
-p1 = Person("Alice", 25) # normal constructor
-p2 = Person.from_birth_year("Bob", 1990) # factory method
-print(p2.name, p2.age) # Bob 35
+# p1 = Person("Alice", 25) # normal constructor
+# p2 = Person.from_birth_year("Bob", 1990) # factory method
 
 
 # 3- @abstractmethod -> Require subclasses to implement the method.
@@ -231,12 +425,29 @@ print(p2.name, p2.age) # Bob 35
 # This can be paired with .setter and .deleter to make a full property.
 # Example:
 
+# Methods of a class cannot be compiled by Numba directly, so the actual computation lives in this plain function,
+# which "maybe_njit" (defined at the top of this file) compiles on its first call. Code that only needs the number
+# can call area_of(r) directly without creating a Circle. Numba treats _PI as a constant when compiling.
+# As with "add", we do not give an exact signature, so Numba compiles a version for the type of "r" it is called with.
+@maybe_njit(cache=True)
+def area_of(r: float) -> float:
+    return _PI * r * r
+
+
 class Circle:
 
+    # __slots__ lists the only attributes an instance can have. Python then stores them in a fixed-size
+    # array inside the object instead of creating a __dict__ for every instance, which saves memory
+    # and makes reading them slightly faster. Assigning any other attribute (e.g., c.color = "red") raises an AttributeError.
+    # "_area" stores the cached area (see "area" below).
+    # "__weakref__" keeps support for weak references (weakref.ref(c)), which classes without __slots__ have by default.
+    __slots__ = ("_radius", "_area", "__weakref__")
+
     def __init__(self, radius):
         # Here, the _radius attribute has an underscore to indicate that it is private and should not be
         # accessed outside of the class. It does not enforce privacy, it's just a signal to other developers.
         self._radius = radius
+        self._area = None
 
 
     # Because of the @property, the function below will be called whenever we write obj.radius
@@ -257,10 +468,13 @@ class Circle:
     # Note that if we do not have this setter function, then obj.radius = anything will yield an error.
     @radius.setter
     def radius(self, value: float) -> None: 
-        if value > 0:
-            self._radius = value
-        else:
+        # We write "not (value > 0)" rather than "value <= 0" because of NaN (float("nan")): every comparison with NaN
+        # is False, so "value <= 0" would let NaN through as a radius, while "not (value > 0)" rejects it.
+        if not (value > 0):
             raise ValueError("Radius must be positive")
+        self._radius = value
+        # The cached area (see "area" below) belongs to the old radius, so we throw it away.
+        self._area = None
     
     # The function below will be called whenever we write 'del obj.radius'.
     @radius.deleter
@@ -268,17 +482,25 @@ class Circle:
         # After deleting self._radius, the attribute will no longer exist. The memory will be freed and it cannot be
         # accessed again. This is also similar to deleting any variable or item from a list.
         del self._radius
+        self._area = None
     
     # This function will be treated as a read-only attribute without having to create another member variable.
     # This also means we can simply write obj.area, instead of obj.area(). This is one of the benefits
     # of using @property.
+    # The area is computed only on the first access and then stored in self._area. Later accesses simply return
+    # that stored value. Because the area depends on the radius, the radius setter and deleter above reset
+    # self._area to None, so the next access computes the area again.
+    # (functools.cached_property does the same thing automatically, but it stores the value in the instance's
+    # __dict__, which instances of a class with __slots__ do not have.)
+    # Inside the class we read self._radius directly instead of self.radius. Reading self.radius would call the
+    # "radius" property function above, which only returns self._radius anyway. The computation itself is done by
+    # area_of(r) above.
     @property
     def area(self) -> float:
-        return 3.14 * self.radius ** 2
-    
-c = Circle(5)
-c.radius = 10
-print(f"Radius = {c.radius}, area = {c.area}")
+        area = self._area
+        if area is None:
+            area = self._area = area_of(self._radius)
+        return area
 
 
 # - - - - - -
@@ -333,3 +555,42 @@ print(f"Radius = {c.radius}, area = {c.area}")
 
 # Removes a reference to a variable, list element, or object attribute.
 # If a property has a deleter, it runs automatically if del obj.property is called.
+
+
+# - - - - - - - - - - - - - -
+#                           -
+# Running the examples      -
+#                           -
+# - - - - - - - - - - - - - -
+
+# The code below only runs when this file is executed directly (python decorators.py), not when it is imported
+# (import decorators). When Python runs a file directly, it sets __name__ to "__main__"; when the file is imported,
+# __name__ is the module name ("decorators"). This keeps importing the module fast and free of side effects.
+# The examples themselves live in _demo(). The leading underscore and its absence from __all__ (at the top of this file)
+# mean that "from decorators import *" does not import it, nor example helpers such as example1, log_add and log_builtin_add.
+def _demo():
+    # The messages of "wrapper" are logged at the DEBUG level, so we enable it here to see them.
+    # They are only logged if this file is run with DECORATOR_LOG=1 (see "log" above).
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+    print(f"Sum = {log_add(1, 2)}")
+    print(f"Sum = {log_builtin_add(1, 2)}")
+
+    example1() # Outputs -> "Executing Example 1".
+    example2(1, 5, 7, "Hello") # Outputs -> "Executing Example 2"
+
+    print(f"Count before incrementing = {MyClass.count}")
+    MyClass.increment_count()
+    print(f"Count after incrementing = {MyClass.count}")
+
+    p1 = Person("Alice", 25) # normal constructor
+    p2 = Person.from_birth_year("Bob", 1990) # factory method
+    print(p1) # Person(name='Alice', age=25) -> this text comes from the __repr__ that @dataclass generates.
+    print(p2.name, p2.age) # Bob 36 (in 2026)
+
+    c = Circle(5)
+    c.radius = 10
+    print(f"Radius = {c.radius}, area = {c.area}")
+
+
+if __name__ == "__main__":
+    _demo()